@@ -1,10 +1,23 @@
+import argparse
+import contextlib
+import io
+import json
 import os
+import sys
 import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
-import xml.etree.ElementTree as ET
+import lxml.etree as ET
 from datetime import datetime
 import time
-from collections import defaultdict
+import functools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import attrgetter
+from dataclasses import asdict, dataclass
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,12 +27,107 @@ API_KEY = os.getenv("NAMECHEAP_API_KEY")
 API_USER = os.getenv("NAMECHEAP_USERNAME")
 CLIENT_IP = os.getenv("CLIENT_IP")
 
+# Set NC_DEBUG_DUMP to save each raw API response to disk
+DEBUG_DUMP = bool(os.getenv("NC_DEBUG_DUMP"))
+
+API_URL = "https://api.namecheap.com/xml.response"
+PAGE_SIZE = 100  # Maximum allowed by the API
+MAX_CONCURRENT_PAGES = 4  # Matches the session pool size, keeps us under rate limits
+
+# Namespace used by Namecheap API responses, with the Clark-notation tags we stream for
+NC_NS = {"nc": "http://api.namecheap.com/xml.response"}
+DOMAIN_TAG = "{%s}Domain" % NC_NS["nc"]
+ERROR_TAG = "{%s}Error" % NC_NS["nc"]
+PAGING_TAG = "{%s}Paging" % NC_NS["nc"]
+
+# Paging fields as XPath expressions compiled once; each returns "" when missing
+PAGING_XPATHS = tuple(
+    ET.XPath(f"string(nc:{field})", namespaces=NC_NS)
+    for field in ("TotalItems", "CurrentPage", "PageSize")
+)
+
+# Shared session so paged requests reuse the pooled TLS connection
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    # raise_on_status=False hands the last 429/5xx back to the status code check
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                      raise_on_status=False),
+))
+
+# Month names for the renewal calendar headers, avoiding strftime("%B")
+MONTH_NAMES = ("January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December")
+
+# Date formats seen in Namecheap responses, most common first
+DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d")
+
+# Order to try DATE_FORMATS in, indexed by the format that last matched
+DATE_FORMAT_ORDERS = tuple(
+    (first,) + tuple(i for i in range(len(DATE_FORMATS)) if i != first)
+    for first in range(len(DATE_FORMATS))
+)
+
+# Mutable state, not a constant: index of the DATE_FORMATS entry that last matched
+_last_date_format = 0
+
+# Bits of Domain.flags, one per boolean attribute in the API response
+F_EXPIRED = 1
+F_LOCKED = 2
+F_AUTORENEW = 4
+F_PREMIUM = 8
+F_OURDNS = 16
+
+@dataclass(slots=True)
+class Domain:
+    """A domain from the Namecheap domain list, based on the Go struct"""
+    id: str
+    name: str
+    user: str
+    created: str
+    expires: str
+    whois_guard: str
+    flags: int  # F_* bits packed into a single int
+    # Derived in display_domains
+    expiry_date_obj: datetime = None
+    days_left: int = None
+    expiry_month: tuple = None  # (year, month)
+    
+    @property
+    def is_expired(self):
+        return bool(self.flags & F_EXPIRED)
+    
+    @property
+    def is_locked(self):
+        return bool(self.flags & F_LOCKED)
+    
+    @property
+    def auto_renew(self):
+        return bool(self.flags & F_AUTORENEW)
+    
+    @property
+    def is_premium(self):
+        return bool(self.flags & F_PREMIUM)
+    
+    @property
+    def is_our_dns(self):
+        return bool(self.flags & F_OURDNS)
+
+class BodyReader:
+    """
+    Read-only view of a streamed response body. The raw stream carries the request
+    URL, which lxml would report as the document name in parse errors and so leak
+    the API key; this wrapper exposes nothing but read()
+    """
+    def __init__(self, raw):
+        self.read = raw.read
+
 def get_domains():
     """
-    Fetch the list of domains from Namecheap API based on the provided Go code structure
+    Fetch the list of domains from Namecheap API based on the provided Go code structure.
+    Returns None if the list could not be fetched at all
     """
-    url = "https://api.namecheap.com/xml.response"
-    
     # Parameters based on Go code structure
     params = {
         "ApiUser": API_USER,
@@ -29,7 +137,7 @@ def get_domains():
         "ClientIp": CLIENT_IP,
         "ListType": "ALL",  # Allowed values: ALL, EXPIRING, EXPIRED
         "Page": "1",
-        "PageSize": "100",  # Maximum allowed value
+        "PageSize": str(PAGE_SIZE),  # Maximum allowed value
         "SortBy": "EXPIREDATE"  # Sort by expiration date
     }
     
@@ -40,89 +148,225 @@ def get_domains():
         else:
             print(f"{key}: {value}")
     
-    response = requests.get(url, params=params)
+    result = fetch_page(params, 1)
+    if result is None:
+        return None
+    domains, paging = result
+    
+    print(f"Found {len(domains)} domains in response")
+    
+    # Check paging information
+    if paging is not None:
+        total_items, current_page, page_size = paging
+        print(f"Paging: Total Items: {total_items}, Current Page: {current_page}, Page Size: {page_size}")
+        
+        try:
+            total_pages = math.ceil(int(total_items) / PAGE_SIZE)
+        except ValueError:
+            total_pages = 1
+        
+        # Fetch the remaining pages concurrently, bounded by the session pool size.
+        # requests.Session is not documented as thread-safe, but its connection pool
+        # is, and the workers only issue GETs through it.
+        if total_pages > 1:
+            failed_pages = 0
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PAGES) as executor:
+                for result in executor.map(lambda page: fetch_page(params, page), range(2, total_pages + 1)):
+                    if result is None:
+                        failed_pages += 1
+                    else:
+                        domains.extend(result[0])
+            if failed_pages:
+                print(f"Warning: {failed_pages} of {total_pages} pages failed; "
+                      f"domain list is incomplete ({len(domains)} of {total_items} domains)")
+            else:
+                print(f"Fetched {total_pages} pages, {len(domains)} domains in total")
+    
+    return domains
+
+def fetch_page(params, page):
+    """
+    Fetch a single page of the domain list and stream-parse its domains.
+    Returns a (domains, paging) tuple, or None if the request failed
+    """
+    # Stream the body so <Domain> elements can be parsed as they arrive
+    try:
+        response = SESSION.get(API_URL, params=dict(params, Page=str(page)), stream=True, timeout=(3.05, 15))
+    except requests.RequestException as e:
+        print(f"\nError fetching page {page}: {e}")
+        return None
     
-    print(f"\nAPI Response Status Code: {response.status_code}")
+    print(f"\nAPI Response Status Code (page {page}): {response.status_code}")
     
     if response.status_code != 200:
         print(f"Error: {response.status_code}")
-        print(response.text)
-        return []
-    
-    # Save the response for debugging
-    with open("api_response.xml", "w") as f:
-        f.write(response.text)
-    print("Response saved to api_response.xml for debugging")
+        # The error body is streamed too, so reading it can still time out
+        try:
+            print(response.text)
+        except requests.RequestException as e:
+            print(f"Error reading page {page}: {e}")
+        return None
     
-    # Parse XML response with namespace awareness
-    root = ET.fromstring(response.text)
+    # Let urllib3 undo any gzip/deflate encoding while we read the raw stream
+    response.raw.decode_content = True
+    source = BodyReader(response.raw)
     
-    # Register the namespace
-    ns = {"nc": "http://api.namecheap.com/xml.response"}
+    try:
+        # Saving the response for debugging needs the full body, so it is opt-in
+        if DEBUG_DUMP:
+            # Keep the body as bytes; the parser honours the XML encoding declaration
+            body = response.content
+            filename = "api_response.xml" if page == 1 else f"api_response_{page}.xml"
+            with open(filename, "wb") as f:
+                f.write(body)
+            print(f"Response saved to {filename} for debugging")
+            source = io.BytesIO(body)
+        
+        status, domains, errors, paging = parse_domain_list(source)
+    except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+        # The body is streamed, so a read timeout or dropped connection surfaces here
+        print(f"\nError reading page {page}: {e}")
+        return None
+    except ET.XMLSyntaxError as e:
+        # Print only the message; the error's filename is not ours to show
+        print(f"\nError parsing page {page}: {e.msg}")
+        return None
     
     # Check if the command was successful
-    status = root.attrib.get("Status")
     if status != "OK":
-        errors = root.findall(".//nc:Errors/nc:Error", ns)
-        if errors:
-            for error in errors:
-                number = error.attrib.get("Number", "Unknown")
-                print(f"API Error {number}: {error.text}")
-        return []
+        for number, text in errors:
+            print(f"API Error {number}: {text}")
+        return None
     
+    return domains, paging
+
+def parse_domain_list(source):
+    """
+    Stream-parse a domain list response from a file-like object.
+    Returns a (status, domains, errors, paging) tuple
+    """
     domains = []
-    # Extract domain information based on the Go struct using namespace
-    domain_elements = root.findall(".//nc:CommandResponse/nc:DomainGetListResult/nc:Domain", ns)
-    
-    print(f"Found {len(domain_elements)} domains in response")
-    
-    for domain in domain_elements:
-        domain_info = {
-            "ID": domain.attrib.get("ID"),
-            "name": domain.attrib.get("Name"),
-            "user": domain.attrib.get("User"),
-            "created": domain.attrib.get("Created"),
-            "expires": domain.attrib.get("Expires"),
-            "is_expired": domain.attrib.get("IsExpired") == "true",
-            "is_locked": domain.attrib.get("IsLocked") == "true",
-            "auto_renew": domain.attrib.get("AutoRenew") == "true",
-            "whois_guard": domain.attrib.get("WhoisGuard"),
-            "is_premium": domain.attrib.get("IsPremium") == "true",
-            "is_our_dns": domain.attrib.get("IsOurDNS") == "true",
-        }
-        domains.append(domain_info)
-    
-    # Check paging information
-    paging = root.find(".//nc:CommandResponse/nc:Paging", ns)
-    if paging is not None:
-        total_items = paging.findtext("nc:TotalItems", "Unknown", ns)
-        current_page = paging.findtext("nc:CurrentPage", "Unknown", ns)
-        page_size = paging.findtext("nc:PageSize", "Unknown", ns)
-        print(f"Paging: Total Items: {total_items}, Current Page: {current_page}, Page Size: {page_size}")
-    
-    return domains
+    errors = []
+    paging = None
+    
+    # Parse XML response incrementally, discarding each <Domain> once extracted
+    context = ET.iterparse(source, events=("end",))
+    for event, elem in context:
+        tag = elem.tag
+        if tag == DOMAIN_TAG:
+            # Extract domain information based on the Go struct
+            attr = elem.attrib
+            domains.append(Domain(
+                attr.get("ID"),
+                attr.get("Name"),
+                attr.get("User"),
+                attr.get("Created"),
+                attr.get("Expires"),
+                attr.get("WhoisGuard"),
+                (F_EXPIRED if attr.get("IsExpired") == "true" else 0)
+                | (F_LOCKED if attr.get("IsLocked") == "true" else 0)
+                | (F_AUTORENEW if attr.get("AutoRenew") == "true" else 0)
+                | (F_PREMIUM if attr.get("IsPremium") == "true" else 0)
+                | (F_OURDNS if attr.get("IsOurDNS") == "true" else 0),
+            ))
+            
+            # Free the element and any already-processed siblings
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        elif tag == ERROR_TAG:
+            errors.append((elem.attrib.get("Number", "Unknown"), elem.text))
+        elif tag == PAGING_TAG:
+            paging = tuple(xpath(elem) or "Unknown" for xpath in PAGING_XPATHS)
+    
+    return context.root.attrib.get("Status"), domains, errors, paging
 
+@functools.lru_cache(maxsize=4096)
 def parse_date(date_str):
     """Parse date from Namecheap API format"""
+    global _last_date_format
     try:
         # Check if the date string is provided
         if not date_str:
             return None
-        
-        # Handle multiple possible date formats
-        for fmt in ["%m/%d/%Y", "%m/%d/%y", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"]:
+
+        # Fast paths for fixed-width MM/DD/YYYY and YYYY-MM-DD, skipping strptime.
+        # Every slice must be ASCII digits, since int() also accepts spaces, signs
+        # and non-ASCII digits that strptime rejects
+        if len(date_str) == 10 and date_str.isascii():
             try:
-                return datetime.strptime(date_str, fmt)
+                if date_str[2] == "/" and date_str[5] == "/":
+                    month, day, year = date_str[0:2], date_str[3:5], date_str[6:10]
+                elif date_str[4] == "-" and date_str[7] == "-":
+                    year, month, day = date_str[0:4], date_str[5:7], date_str[8:10]
+                else:
+                    month = day = year = ""
+                if month.isdigit() and day.isdigit() and year.isdigit():
+                    return datetime(int(year), int(month), int(day))
+            except ValueError:
+                pass  # Not a valid date of that shape, let strptime decide
+
+        # Handle multiple possible date formats, starting with the one that
+        # matched last time since a response uses the same format throughout
+        for i in DATE_FORMAT_ORDERS[_last_date_format]:
+            try:
+                parsed = datetime.strptime(date_str, DATE_FORMATS[i])
             except ValueError:
                 continue
+            _last_date_format = i
+            return parsed
         
-        # If none of the formats match
-        print(f"Warning: Unable to parse date: {date_str}")
+        # If none of the formats match; the caller warns, since this result is cached
         return None
     except Exception as e:
         print(f"Error parsing date {date_str}: {e}")
         return None
 
+def sort_by_expiry(domains):
+    """
+    Fill in each domain's parsed expiry date, days left and expiry month,
+    and return the domains sorted by expiry date
+    """
+    today = datetime.now()
+    
+    for domain in domains:
+        # Add parsed expiry date for sorting, plus the derived values used below
+        obj = parse_date(domain.expires)
+        if obj is None and domain.expires:
+            print(f"Warning: Unable to parse date: {domain.expires}")
+        domain.expiry_date_obj = obj
+        domain.days_left = (obj - today).days if obj else None
+        domain.expiry_month = (obj.year, obj.month) if obj else None
+    
+    # Sort domains by expiry date, keeping unparseable dates at the end
+    return sorted(domains, key=lambda x: x.expiry_date_obj or datetime.max)
+
+def display_domains_json(domains):
+    """
+    Write domains sorted by expiry date as a compact JSON array, for scripting
+    """
+    # Date parsing warnings must not end up in the JSON on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        sorted_domains = sort_by_expiry(domains)
+    
+    records = []
+    for domain in sorted_domains:
+        record = asdict(domain)
+        # Expose the packed flags as the booleans they stand for
+        del record["flags"]
+        record.update(
+            expiry_date_obj=domain.expiry_date_obj.isoformat() if domain.expiry_date_obj else None,
+            is_expired=domain.is_expired,
+            is_locked=domain.is_locked,
+            auto_renew=domain.auto_renew,
+            is_premium=domain.is_premium,
+            is_our_dns=domain.is_our_dns,
+        )
+        records.append(record)
+    
+    json.dump(records, sys.stdout, separators=(",", ":"))
+    sys.stdout.write("\n")
+
 def display_domains(domains):
     """
     Display domains and their renewal dates in the terminal
@@ -131,140 +375,120 @@ def display_domains(domains):
         print("No domains found. Please check your API credentials and parameters.")
         return
     
-    print(f"\nTotal domains: {len(domains)}")
-    print(f"\n{'Domain Name':<30} {'Expiry Date':<20} {'Created Date':<20} {'Auto Renew':<12} {'Is Locked':<10} {'WHOIS Guard':<15}")
-    print("-" * 120)
-    
-    # Sort domains by expiry date
-    sorted_domains = []
-    for domain in domains:
-        # Add parsed expiry date for sorting
-        domain["expiry_date_obj"] = parse_date(domain["expires"])
-        if domain["expiry_date_obj"]:
-            sorted_domains.append(domain)
-        else:
-            # Still include domains with unparseable dates, but at the end
-            sorted_domains.append(domain)
-    
-    # Sort only the ones with valid dates
-    valid_dates = [d for d in sorted_domains if d["expiry_date_obj"] is not None]
-    invalid_dates = [d for d in sorted_domains if d["expiry_date_obj"] is None]
+    # Write the header before parsing dates so any parse warnings follow it
+    sys.stdout.write(f"\nTotal domains: {len(domains)}\n"
+                     f"\n{'Domain Name':<30} {'Expiry Date':<20} {'Created Date':<20} {'Auto Renew':<12} {'Is Locked':<10} {'WHOIS Guard':<15}\n"
+                     + "-" * 120 + "\n")
     
-    sorted_domains = sorted(valid_dates, key=lambda x: x["expiry_date_obj"]) + invalid_dates
+    sorted_domains = sort_by_expiry(domains)
     
-    today = datetime.now()
+    # Collect the remaining output lines and write them in one go rather than per print()
+    out = []
     
     for domain in sorted_domains:
-        expiry_date = domain["expires"] if domain["expires"] else "N/A"
-        created_date = domain["created"] if domain["created"] else "N/A"
+        expiry_date = domain.expires if domain.expires else "N/A"
+        created_date = domain.created if domain.created else "N/A"
         
         # Calculate days until expiry
         days_left = ""
-        if domain["expiry_date_obj"]:
-            delta = domain["expiry_date_obj"] - today
-            days_left = f"({delta.days} days left)"
+        if domain.expiry_date_obj:
+            days = domain.days_left
+            days_left = f"({days} days left)"
             
             # Highlight domains expiring soon
-            if 0 < delta.days <= 30:
+            if 0 < days <= 30:
                 expiry_date = f"{expiry_date} {days_left} - RENEW SOON!"
-            elif delta.days <= 0:
+            elif days <= 0:
                 expiry_date = f"{expiry_date} - EXPIRED!"
             else:
                 expiry_date = f"{expiry_date} {days_left}"
         
-        print(f"{domain['name']:<30} {expiry_date:<20} {created_date:<20} "
-              f"{'Yes' if domain['auto_renew'] else 'No':<12} "
-              f"{'Yes' if domain['is_locked'] else 'No':<10} "
-              f"{domain['whois_guard']:<15}")
+        out.append(f"{domain.name:<30} {expiry_date:<20} {created_date:<20} "
+                   f"{'Yes' if domain.auto_renew else 'No':<12} "
+                   f"{'Yes' if domain.is_locked else 'No':<10} "
+                   f"{domain.whois_guard:<15}")
     
     # Show upcoming renewals
-    print("\n--- Upcoming Renewals (next 90 days) ---")
+    out.append("\n--- Upcoming Renewals (next 90 days) ---")
     upcoming = [d for d in sorted_domains 
-                if d["expiry_date_obj"] is not None 
-                and 0 < (d["expiry_date_obj"] - today).days <= 90]
+                if d.days_left is not None 
+                and 0 < d.days_left <= 90]
     
     if upcoming:
-        print(f"\n{'Domain Name':<30} {'Expiry Date':<20} {'Days Left':<10} {'Auto Renew'}")
-        print("-" * 75)
+        out.append(f"\n{'Domain Name':<30} {'Expiry Date':<20} {'Days Left':<10} {'Auto Renew'}")
+        out.append("-" * 75)
         
         for domain in upcoming:
-            days_left = (domain["expiry_date_obj"] - today).days
-            print(f"{domain['name']:<30} {domain['expires']:<20} {days_left:<10} {'Yes' if domain['auto_renew'] else 'No'}")
+            out.append(f"{domain.name:<30} {domain.expires:<20} {domain.days_left:<10} {'Yes' if domain.auto_renew else 'No'}")
     else:
-        print("No domains expiring in the next 90 days.")
+        out.append("No domains expiring in the next 90 days.")
     
     # Domain statistics
-    print("\n--- Domain Statistics ---")
+    out.append("\n--- Domain Statistics ---")
     total = len(domains)
-    auto_renew = sum(1 for d in domains if d["auto_renew"])
-    locked = sum(1 for d in domains if d["is_locked"])
-    whois_guard_enabled = sum(1 for d in domains if d["whois_guard"] == "ENABLED")
-    
-    print(f"Total domains: {total}")
-    print(f"Auto-renew enabled: {auto_renew} ({auto_renew/total*100:.1f}% of all domains)")
-    print(f"Locked domains: {locked} ({locked/total*100:.1f}% of all domains)")
-    print(f"WHOIS guard enabled: {whois_guard_enabled} ({whois_guard_enabled/total*100:.1f}% of all domains)")
+    auto_renew = locked = whois_guard_enabled = 0
+    for d in domains:
+        # Test the packed bits directly rather than going through the properties
+        auto_renew += (d.flags & F_AUTORENEW) != 0
+        locked += (d.flags & F_LOCKED) != 0
+        whois_guard_enabled += d.whois_guard == "ENABLED"
+    
+    per = total or 1  # Avoid dividing by zero on an empty list
+    out.append(f"Total domains: {total}")
+    out.append(f"Auto-renew enabled: {auto_renew} ({auto_renew/per*100:.1f}% of all domains)")
+    out.append(f"Locked domains: {locked} ({locked/per*100:.1f}% of all domains)")
+    out.append(f"WHOIS guard enabled: {whois_guard_enabled} ({whois_guard_enabled/per*100:.1f}% of all domains)")
     
     # Calendar year view
-    print("\n--- Domain Renewal Calendar ---")
-    
-    # Group domains by month and year of expiry
-    domains_by_month = defaultdict(list)
-    
-    # Map of month names to their numeric values for sorting
-    month_map = {
-        "January": 1, "February": 2, "March": 3, "April": 4, 
-        "May": 5, "June": 6, "July": 7, "August": 8, 
-        "September": 9, "October": 10, "November": 11, "December": 12
-    }
-    
-    for domain in sorted_domains:
-        if domain["expiry_date_obj"]:
-            month_year = domain["expiry_date_obj"].strftime("%B %Y")  # e.g., "November 2025"
-            domains_by_month[month_year].append(domain)
-    
-    # Sort the months chronologically
-    def month_year_key(month_year_str):
-        # Split the string into month and year
-        parts = month_year_str.split()
-        if len(parts) != 2:
-            return (9999, 13)  # Invalid format, place at the end
-        
-        month_name, year_str = parts
-        
-        try:
-            # Convert year to integer
-            year = int(year_str)
-            # Get month number from the map
-            month_num = month_map.get(month_name, 13)  # Default to 13 (beyond December) if not found
-            return (year, month_num)
-        except (ValueError, KeyError):
-            return (9999, 13)  # Invalid format, place at the end
-    
-    # Print domains by month in chronological order
-    for month_year in sorted(domains_by_month.keys(), key=month_year_key):
-        print(f"\n{month_year}:")
-        for domain in domains_by_month[month_year]:
-            print(f"  - {domain['name']} (Expires: {domain['expires']})")
+    out.append("\n--- Domain Renewal Calendar ---")
+    
+    # Domains are already sorted by expiry, so consecutive runs share a (year, month);
+    # unparseable dates sort last and are grouped under None
+    for month_key, month_domains in groupby(sorted_domains, key=attrgetter("expiry_month")):
+        if month_key is None:
+            break
+        year, month = month_key
+        out.append(f"\n{MONTH_NAMES[month - 1]} {year}:")  # e.g., "November 2025"
+        for domain in month_domains:
+            out.append(f"  - {domain.name} (Expires: {domain.expires})")
+    
+    sys.stdout.write("\n".join(out) + "\n")
+
 
 if __name__ == "__main__":
-    if not API_KEY or not API_USER or not CLIENT_IP:
-        print("Error: Environment variables not set.")
-        print("Please create a .env file with NAMECHEAP_API_KEY, NAMECHEAP_USERNAME, and CLIENT_IP")
-        exit(1)
-    
-    print(f"Namecheap Domain Checker")
-    print(f"=" * 30)
-    print(f"Username: {API_USER}")
-    print(f"Client IP: {CLIENT_IP}")
-    print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"=" * 30)
-    print("Fetching domains from Namecheap...")
-    
-    start_time = time.time()
-    domains = get_domains()
-    end_time = time.time()
-    
-    print(f"Time taken: {end_time - start_time:.2f} seconds")
-    
-    display_domains(domains)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="List Namecheap domains and their renewal dates")
+    parser.add_argument("--format", choices=("table", "json"), default="table",
+                        help="table for the human-readable report, json for a compact machine-readable list")
+    args = parser.parse_args()
+    
+    # In JSON mode keep stdout for the JSON itself and send everything else to stderr
+    json_mode = args.format == "json"
+    progress_out = sys.stderr if json_mode else sys.stdout
+    with contextlib.redirect_stdout(progress_out):
+        if not API_KEY or not API_USER or not CLIENT_IP:
+            print("Error: Environment variables not set.")
+            print("Please create a .env file with NAMECHEAP_API_KEY, NAMECHEAP_USERNAME, and CLIENT_IP")
+            exit(1)
+        
+        print(f"Namecheap Domain Checker")
+        print(f"=" * 30)
+        print(f"Username: {API_USER}")
+        print(f"Client IP: {CLIENT_IP}")
+        print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"=" * 30)
+        print("Fetching domains from Namecheap...")
+    
+        start_time = time.time()
+        domains = get_domains()
+        end_time = time.time()
+    
+        print(f"Time taken: {end_time - start_time:.2f} seconds")
+    
+    if json_mode:
+        # An empty array must mean "no domains", so a failed fetch exits non-zero
+        if domains is None:
+            print("Error: Unable to fetch the domain list from Namecheap.", file=sys.stderr)
+            exit(1)
+        display_domains_json(domains)
+    else:
+        display_domains(domains)
\ No newline at end of file